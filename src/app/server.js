@@ -26,6 +26,7 @@ import { WebSocketServer } from 'ws';
 import { createServer } from 'http';
 import Redis from 'ioredis';
 import { bindRedis as bindProviderKeysRedis, initProviderKeys } from '../infra/provider_keys.js';
+import { getCacheStats, warmupKnowledge } from '../domain/knowledge/rag.js';
 import { getErrorStats, filterErrorsByCategory, filterErrorsBySeverity, trapError, createErrorHandler } from '../core/errors.js';
 
 // Create error handler for server module
@@ -527,23 +528,37 @@ app.get('/api/events', (req, res) => {
  * CORTEX Status (NVIDIA Direct API)
  * Reports availability of NVIDIA RAG/Safety features
  * GET /api/bridge/status
+ *
+ * Both possible payloads are fixed, so they are serialized to bytes once
+ * at startup and written directly with a known Content-Length.
  */
+const BRIDGE_STATUS_ONLINE = Buffer.from(JSON.stringify({
+    status: 'online',
+    provider: 'nvidia',
+    features: ['embeddings', 'reranking', 'safety']
+}));
+const BRIDGE_STATUS_OFFLINE = Buffer.from(JSON.stringify({
+    status: 'offline',
+    provider: 'nvidia',
+    error: 'NVIDIA_API_KEY not configured'
+}));
+
 app.get('/api/bridge/status', async (req, res) => {
-    const hasNvidia = !!process.env.NVIDIA_API_KEY;
+    const body = process.env.NVIDIA_API_KEY ? BRIDGE_STATUS_ONLINE : BRIDGE_STATUS_OFFLINE;
 
-    if (hasNvidia) {
-        res.json({
-            status: 'online',
-            provider: 'nvidia',
-            features: ['embeddings', 'reranking', 'safety']
-        });
-    } else {
-        res.json({
-            status: 'offline',
-            provider: 'nvidia',
-            error: 'NVIDIA_API_KEY not configured'
-        });
-    }
+    res.set({
+        'Content-Type': 'application/json; charset=utf-8',
+        'Content-Length': body.length
+    });
+    res.end(body);
+});
+
+/**
+ * CORTEX cache hit rates
+ * GET /api/bridge/stats
+ */
+app.get('/api/bridge/stats', (req, res) => {
+    res.json(getCacheStats());
 });
 
 // Project History & Deliverables API
@@ -588,17 +603,23 @@ wss.on('connection', (ws, req) => {
     handleMediaStream(ws, req);
 });
 
+// WebSocket upgrade routes: pathname -> WebSocketServer
+const UPGRADE_ROUTES = new Map([
+    ['/media-stream', wss]
+]);
+
 // Handle WebSocket upgrade requests
 server.on('upgrade', (request, socket, head) => {
     const pathname = new URL(request.url, `http://${request.headers.host}`).pathname;
+    const target = UPGRADE_ROUTES.get(pathname);
 
-    if (pathname === '/media-stream') {
-        wss.handleUpgrade(request, socket, head, (ws) => {
-            wss.emit('connection', ws, request);
-        });
-    } else {
+    if (!target) {
         socket.destroy();
+        return;
     }
+    target.handleUpgrade(request, socket, head, (ws) => {
+        target.emit('connection', ws, request);
+    });
 });
 
 // Start server with WebSocket support
@@ -613,6 +634,11 @@ server.listen(PORT, '0.0.0.0', () => {
     console.log(`🔊 ElevenLabs Voice: ${isElevenLabsEnabled() ? 'ENABLED' : 'DISABLED (using Polly fallback)'}`);
     console.log(`🌐 WebSocket: ENABLED on /media-stream`);
 
+    // Warm the CORTEX embedding cache in the background (no-op without NVIDIA_API_KEY)
+    warmupKnowledge()
+        .then(count => { if (count > 0) console.log(`🧠 CORTEX warmup: ${count} queries cached`); })
+        .catch(err => console.warn('CORTEX warmup failed', err.message));
+
     // Start the Central Orchestrator (Mei's Nervous System)
     getOrchestrator();
     console.log(`🧠 Orchestrator: ONLINE (Listening for DISPATCH events)`);
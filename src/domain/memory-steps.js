@@ -3,6 +3,11 @@
  * Structured memory system for tracking agent execution steps
  */
 
+// Tool call ids: per-process base36 prefix + counter. Unique without a clock
+// read or Math.random() per call, and no same-millisecond collision window.
+const TOOL_ID_PREFIX = Date.now().toString(36);
+let toolIdSeq = 0;
+
 /**
  * Token usage tracking
  */
@@ -125,7 +130,7 @@ export class ActionStep extends MemoryStep {
 
     addToolCall(name, args, id = null) {
         this.toolCalls.push({
-            id: id || `tool_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
+            id: id || `tool_${TOOL_ID_PREFIX}_${(toolIdSeq++).toString(36)}`,
             name,
             arguments: args
         });
@@ -3,7 +3,11 @@
  * Token tracking, timing, and agent logger
  */
 
-import { TokenUsage, Timing } from './domain/memory-steps.js';
+import { TokenUsage, Timing } from '../domain/memory-steps.js';
+
+// Step durations are kept in a fixed-size ring so long-running agents don't
+// grow an unbounded array; averages use running totals and stay exact.
+const STEP_HISTORY_SIZE = 4096;
 
 /**
  * Monitor - Tracks overall agent execution metrics
@@ -11,7 +15,9 @@ import { TokenUsage, Timing } from './domain/memory-steps.js';
 export class Monitor {
     constructor(options = {}) {
         this.logger = options.logger || console;
-        this.stepDurations = [];
+        this.stepDurations = new Float64Array(STEP_HISTORY_SIZE); // Ring buffer (seconds)
+        this.stepCount = 0;
+        this.stepDurationTotal = 0;
         this.totalInputTokens = 0;
         this.totalOutputTokens = 0;
         this.startTime = null;
@@ -20,7 +26,8 @@ export class Monitor {
 
     start() {
         this.startTime = Date.now();
-        this.stepDurations = [];
+        this.stepCount = 0;
+        this.stepDurationTotal = 0;
         this.totalInputTokens = 0;
         this.totalOutputTokens = 0;
         return this;
@@ -46,7 +53,9 @@ export class Monitor {
      */
     updateFromStep(step) {
         if (step.timing?.duration) {
-            this.stepDurations.push(step.timing.duration);
+            this.stepDurations[this.stepCount % STEP_HISTORY_SIZE] = step.timing.duration;
+            this.stepCount++;
+            this.stepDurationTotal += step.timing.duration;
         }
         if (step.tokenUsage) {
             this.totalInputTokens += step.tokenUsage.inputTokens;
@@ -54,16 +63,29 @@ export class Monitor {
         }
     }
 
+    /**
+     * Step-duration percentile over the retained window
+     * @param {number} p - Percentile in [0, 100]
+     */
+    stepDurationPercentile(p) {
+        const n = Math.min(this.stepCount, STEP_HISTORY_SIZE);
+        if (n === 0) return 0;
+        const sorted = this.stepDurations.slice(0, n).sort(); // Typed arrays sort numerically
+        return sorted[Math.min(n - 1, Math.floor((p / 100) * n))];
+    }
+
     /**
      * Get summary of metrics
      */
     getSummary() {
         return {
             totalDuration: this.totalDuration,
-            totalSteps: this.stepDurations.length,
-            avgStepDuration: this.stepDurations.length > 0
-                ? this.stepDurations.reduce((a, b) => a + b, 0) / this.stepDurations.length
+            totalSteps: this.stepCount,
+            avgStepDuration: this.stepCount > 0
+                ? this.stepDurationTotal / this.stepCount
                 : 0,
+            p50StepDuration: this.stepDurationPercentile(50),
+            p95StepDuration: this.stepDurationPercentile(95),
             totalInputTokens: this.totalInputTokens,
             totalOutputTokens: this.totalOutputTokens,
             totalTokens: this.totalTokens
@@ -79,7 +101,7 @@ export class Monitor {
         this.logger.log(`   Duration: ${summary.totalDuration.toFixed(2)}s`);
         this.logger.log(`   Steps: ${summary.totalSteps}`);
         if (summary.avgStepDuration > 0) {
-            this.logger.log(`   Avg step: ${summary.avgStepDuration.toFixed(2)}s`);
+            this.logger.log(`   Avg step: ${summary.avgStepDuration.toFixed(2)}s (p95: ${summary.p95StepDuration.toFixed(2)}s)`);
         }
         if (summary.totalTokens > 0) {
             this.logger.log(`   Tokens: ${summary.totalTokens} (in: ${summary.totalInputTokens}, out: ${summary.totalOutputTokens})`);
@@ -87,7 +109,8 @@ export class Monitor {
     }
 
     reset() {
-        this.stepDurations = [];
+        this.stepCount = 0;
+        this.stepDurationTotal = 0;
         this.totalInputTokens = 0;
         this.totalOutputTokens = 0;
         this.startTime = null;
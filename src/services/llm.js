@@ -21,6 +21,10 @@ import { AGENT_PREAMBLE_COMPACT, validateAgentResponse } from '../core/preamble.
 let anthropicClient = null;
 let openaiClient = null;
 
+// Gemini doesn't return tool call ids - mint them from a per-process counter
+const GEMINI_ID_PREFIX = Date.now().toString(36);
+let geminiIdSeq = 0;
+
 // Constitutional enforcement toggle (can be disabled for testing)
 let constitutionEnabled = true;
 
@@ -314,7 +318,7 @@ async function chatGeminiWithTools(systemPrompt, userMessage, tools, options) {
         const result = {
             text: textParts.map(p => p.text).join('\n'),
             toolCalls: functionCalls.map(p => ({
-                id: `gemini_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
+                id: `gemini_${GEMINI_ID_PREFIX}_${(geminiIdSeq++).toString(36)}`,
                 name: p.functionCall.name,
                 input: p.functionCall.args
             })),
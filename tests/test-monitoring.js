@@ -0,0 +1,39 @@
+/**
+ * Monitor Smoke Test
+ *
+ * Imports the monitoring module and checks the step-duration ring buffer:
+ * 1. Averages stay exact after the ring wraps
+ * 2. Percentiles cover only the retained window
+ * 3. reset() clears the counters
+ *
+ * Run: node tests/test-monitoring.js
+ */
+
+import assert from 'assert/strict';
+import { Monitor } from '../src/infra/monitoring.js';
+
+const monitor = new Monitor({ logger: { log: () => { } } }).start();
+
+for (let i = 1; i <= 5000; i++) {
+    monitor.updateFromStep({
+        timing: { duration: i / 1000 },
+        tokenUsage: { inputTokens: 2, outputTokens: 1 }
+    });
+}
+monitor.end();
+
+const summary = monitor.getSummary();
+assert.equal(summary.totalSteps, 5000);
+assert.ok(Math.abs(summary.avgStepDuration - 2.5005) < 1e-9, 'average covers every step');
+// Ring holds the last 4096 steps (0.905s .. 5.000s)
+assert.equal(monitor.stepDurationPercentile(0), 0.905);
+assert.equal(monitor.stepDurationPercentile(100), 5);
+assert.ok(summary.p50StepDuration > 2.9 && summary.p50StepDuration < 3.0);
+assert.equal(summary.totalTokens, 15000);
+monitor.printSummary();
+
+monitor.reset();
+assert.equal(monitor.getSummary().totalSteps, 0);
+assert.equal(monitor.stepDurationPercentile(95), 0);
+
+console.log('✅ Monitor tests passed');